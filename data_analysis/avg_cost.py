@@ -1,7 +1,40 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from table_cache import load_table, mean_pivot
+
+def group_stats(values, group_ids, n_groups):
+    """
+    Computes per-group sums, counts and the position of each group's largest
+    value, using vectorised NumPy reductions over all groups at once.
+
+    As with a pandas groupby, NaN values and missing groups (code -1) are
+    skipped, and groups without any remaining value are left out.
+
+    Args:
+        values (np.ndarray): The float64 values to reduce.
+        group_ids (np.ndarray): The group code (0 to n_groups - 1, or -1) of each value.
+        n_groups (int): The number of groups.
+
+    Returns:
+        tuple: Arrays of the observed group codes and, for each of them, the sum,
+            count, and argmax position into the original values.
+            Ties resolve to the first occurrence, as with pandas' idxmax.
+    """
+    positions = np.flatnonzero(~np.isnan(values) & (group_ids >= 0))
+    values, group_ids = values[positions], group_ids[positions]
+
+    sums = np.bincount(group_ids, weights=values, minlength=n_groups)
+    counts = np.bincount(group_ids, minlength=n_groups)
+    observed = np.flatnonzero(counts)
+
+    # After a stable sort by (group, -value), each group's first entry is its largest
+    starts = (np.cumsum(counts) - counts)[observed]
+    argmax = positions[np.lexsort((-values, group_ids))[starts]]
+    return observed, sums[observed], counts[observed], argmax
+
 
 def analyze_gas_costs(filepath='contract.csv'):
     """
@@ -16,7 +49,10 @@ def analyze_gas_costs(filepath='contract.csv'):
     """
     # --- 1. Data Loading and Preparation ---
     try:
-        df = pd.read_csv(filepath)
+        df = load_table(
+            filepath,
+            dtype={'Contract': 'category', 'Network': 'category', 'Function': 'category', 'usd avg': 'float64'},
+        )
     except FileNotFoundError:
         print(f"Error: The file '{filepath}' was not found.")
         return
@@ -27,7 +63,9 @@ def analyze_gas_costs(filepath='contract.csv'):
         os.makedirs(output_dir)
 
     sns.set_theme(style="whitegrid", palette="viridis")
-    plt.rcParams['figure.dpi'] = 300
+    # Figures are only ever saved, so lay them out at screen resolution and
+    # render the 300 DPI output once in savefig
+    plt.rcParams['figure.dpi'] = 100
     plt.rcParams['savefig.dpi'] = 300
 
     # --- 3. Generate Focused Visualizations ---
@@ -35,104 +73,123 @@ def analyze_gas_costs(filepath='contract.csv'):
     # A. Merged 3x2 Grid of Grouped Bar Charts
     print("Generating merged 3x2 grid of bar charts...")
     contracts = df['Contract'].unique()
-
-    fig, axes = plt.subplots(3, 2, figsize=(24, 28))
-    fig.suptitle('Side-by-Side Cost Comparison Across All Contracts', fontsize=24, fontweight='bold', y=0.98)
+    # Average cost per contract function and network, built once for all subplots
+    # (rows: Contract/Function, columns: Network)
+    pivot_all = mean_pivot(df)
+    # Same muted colours seaborn's barplot uses by default
+    network_palette = sns.color_palette('viridis', len(pivot_all.columns), desat=0.75)
+
+    # One figure is created here and cleared/resized for the heatmap and box plot
+    fig, axes = plt.subplots(3, 2, figsize=(24, 28), constrained_layout=True)
+    fig.suptitle('Side-by-Side Cost Comparison Across All Contracts', fontsize=24, fontweight='bold')
     axes = axes.flatten()
 
     for i, contract in enumerate(contracts):
         if i < len(axes):
             ax = axes[i]
-            contract_data = df[df['Contract'] == contract]
-
-            sns.barplot(data=contract_data, x='Function', y='usd avg', hue='Network', palette='viridis', ax=ax)
+            pivot_all.xs(contract).plot(kind='bar', ax=ax, color=network_palette, width=0.8, rasterized=True)
+            ax.xaxis.grid(False)
 
             ax.set_title(f'Cost Comparison for {contract}', fontsize=16, fontweight='bold', pad=15)
             ax.set_xlabel('Function', fontsize=12)
             ax.set_ylabel('Average Cost (USD)', fontsize=12)
             ax.legend(title='Network', fontsize=10)
             
-            # --- COMPLETELY NEW IMPLEMENTATION FOR LABELS ---
-            # Loop through each label and set its properties individually.
-            for label in ax.get_xticklabels():
-                label.set_rotation(45)
-                label.set_ha('right') # 'ha' is the alias for horizontalalignment
-                label.set_fontsize(10)
+            # Rotate and right-align the tick labels in one batched update
+            ax.tick_params(axis='x', labelsize=10)
+            plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     
     # Hide any unused subplots
     for j in range(i + 1, len(axes)):
         fig.delaxes(axes[j])
 
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
     merged_chart_path = os.path.join(output_dir, 'merged_contract_cost_comparison.png')
-    plt.savefig(merged_chart_path)
-    plt.close(fig)
+    fig.savefig(merged_chart_path)
     print(f"Saved merged contract chart to '{merged_chart_path}'")
 
     # B. Heatmap of Average Costs
     print("\nGenerating cost heatmap...")
-    plt.figure(figsize=(12, 10))
-    pivot_data = df.pivot_table(values='usd avg', index='Function', columns='Network', aggfunc='mean')
-    ax_heatmap = sns.heatmap(pivot_data, annot=False, cmap='viridis', linewidths=.5, cbar_kws={'label': 'Average Cost (USD)'})
+    fig.clf()
+    fig.set_size_inches(12, 10)
+    pivot_data = df.pivot_table(values='usd avg', index='Function', columns='Network', aggfunc='mean', observed=True)
+    ax_heatmap = fig.add_subplot()
+    heatmap = ax_heatmap.imshow(pivot_data.to_numpy(), aspect='auto', cmap='viridis', interpolation='nearest')
+    fig.colorbar(heatmap, ax=ax_heatmap, label='Average Cost (USD)')
+    ax_heatmap.set_xticks(range(len(pivot_data.columns)), pivot_data.columns)
+    ax_heatmap.set_yticks(range(len(pivot_data.index)), pivot_data.index)
+    ax_heatmap.grid(False)
     ax_heatmap.set_title('Heatmap of Average Transaction Costs (USD)', fontsize=16, fontweight='bold', pad=20)
     ax_heatmap.set_xlabel('Network', fontsize=12, fontweight='bold')
     ax_heatmap.set_ylabel('Function', fontsize=12, fontweight='bold')
     
-    # Apply new label implementation
-    for label in ax_heatmap.get_xticklabels():
-        label.set_rotation(45)
-        label.set_ha('right')
+    # Rotate and right-align the tick labels in one batched update
+    plt.setp(ax_heatmap.get_xticklabels(), rotation=45, ha='right')
     
-    plt.tight_layout()
     heatmap_path = os.path.join(output_dir, 'cost_heatmap.png')
-    plt.savefig(heatmap_path)
-    plt.close()
+    fig.savefig(heatmap_path)
     print(f"Saved heatmap to '{heatmap_path}'")
 
     # C. Box Plot of Cost Distributions
     print("\nGenerating cost distribution box plot...")
-    plt.figure(figsize=(12, 8))
-    ax_box = sns.boxplot(data=df, x='Network', y='usd avg', palette='viridis')
+    fig.clf()
+    fig.set_size_inches(12, 8)
+    ax_box = fig.add_subplot()
+    # ax.boxplot does not skip missing costs the way seaborn did, so drop them per network
+    network_costs = {network: costs.dropna().to_numpy(dtype='float64') for network, costs in df.groupby('Network', observed=True)['usd avg']}
+    boxes = ax_box.boxplot(list(network_costs.values()), positions=range(len(network_costs)), widths=0.8,
+                           patch_artist=True, medianprops={'color': 'black'})
+    for patch, color in zip(boxes['boxes'], network_palette):
+        patch.set_facecolor(color)
+    ax_box.set_xticks(range(len(network_costs)), list(network_costs))
+    ax_box.xaxis.grid(False)
     ax_box.set_yscale('log')
     ax_box.set_title('Distribution of Transaction Costs by Network (Log Scale)', fontsize=16, fontweight='bold', pad=20)
     ax_box.set_xlabel('Network', fontsize=12, fontweight='bold')
     ax_box.set_ylabel('Average Cost (USD) - Log Scale', fontsize=12, fontweight='bold')
     
-    # Apply new label implementation
-    for label in ax_box.get_xticklabels():
-        label.set_rotation(45)
-        label.set_ha('right')
+    # Rotate and right-align the tick labels in one batched update
+    plt.setp(ax_box.get_xticklabels(), rotation=45, ha='right')
         
-    plt.tight_layout()
     boxplot_path = os.path.join(output_dir, 'cost_distribution_boxplot.png')
-    plt.savefig(boxplot_path)
-    plt.close()
+    fig.savefig(boxplot_path)
+    plt.close(fig)
     print(f"Saved box plot to '{boxplot_path}'")
 
     # --- 4. Deeper Summary Analysis ---
     print("\n" + "=" * 80)
     print("GAS COST STATISTICAL SUMMARY")
     print("=" * 80)
+
+    # Mean and most expensive row of every network in a single grouped pass
+    networks = df['Network'].cat.categories
+    observed, sums, counts, argmax = group_stats(
+        df['usd avg'].to_numpy(dtype='float64', na_value=np.nan), df['Network'].cat.codes.to_numpy(), len(networks)
+    )
+    network_stats = pd.DataFrame(
+        {'mean': sums / counts, 'idxmax': df.index[argmax]}, index=networks[observed]
+    )
+    most_expensive_per_network = df.loc[network_stats['idxmax']]
     
     # A. Network Efficiency Ranking
     print("\n1. NETWORK COST EFFICIENCY RANKING (Lowest Average Cost First):")
     print("-" * 60)
-    network_avg = df.groupby('Network')['usd avg'].mean().sort_values()
+    network_avg = network_stats['mean'].sort_values()
     for rank, (network, cost) in enumerate(network_avg.items(), 1):
         print(f"  {rank}. {network:<15} - Average Cost: ${cost:.6f}")
 
     # B. Most & Least Expensive Operations
     print("\n2. OVERALL MOST & LEAST EXPENSIVE OPERATIONS:")
     print("-" * 60)
-    most_expensive = df.loc[df['usd avg'].idxmax()]
-    least_expensive = df.loc[df['usd avg'].idxmin()]
+    # Picked from all rows, so ties resolve to the first row in file order
+    overall = df['usd avg'].agg(['idxmax', 'idxmin'])
+    most_expensive = df.loc[overall['idxmax']]
+    least_expensive = df.loc[overall['idxmin']]
     print(f"  - Most Expensive: {most_expensive['Network']} - {most_expensive['Contract']}/{most_expensive['Function']} (${most_expensive['usd avg']:.6f})")
     print(f"  - Least Expensive: {least_expensive['Network']} - {least_expensive['Contract']}/{least_expensive['Function']} (${least_expensive['usd avg']:.6f})")
 
     # C. Most Expensive Operation per Network
     print("\n3. MOST EXPENSIVE OPERATION PER NETWORK:")
     print("-" * 60)
-    most_expensive_per_network = df.loc[df.groupby('Network')['usd avg'].idxmax()]
     for _, row in most_expensive_per_network.iterrows():
         print(f"  - {row['Network']:<15}: {row['Contract']}/{row['Function']} (${row['usd avg']:.6f})")
 
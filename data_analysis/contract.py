@@ -1,7 +1,7 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from table_cache import load_table, mean_pivot
 
 def create_line_charts(filepath='contract.csv'):
     """
@@ -12,7 +12,10 @@ def create_line_charts(filepath='contract.csv'):
 
     # --- 1. Data Loading ---
     try:
-        df = pd.read_csv(filepath)
+        df = load_table(
+            filepath,
+            dtype={'Contract': 'category', 'Network': 'category', 'Function': 'category', 'usd avg': 'float64'},
+        )
     except FileNotFoundError:
         print(f"Error: The file '{filepath}' was not found. Please ensure it is in the same directory.")
         return
@@ -25,46 +28,50 @@ def create_line_charts(filepath='contract.csv'):
     contracts = df['Contract'].unique()
     networks = df['Network'].unique()
 
+    # Average cost of every function on every network, computed once up front
+    # (rows: Contract/Function, columns: Network)
+    pivot_all = mean_pivot(df)
+    # Spread of those averages across networks for each contract function
+    variation_all = pivot_all.std(axis=1)
+
     # --- 3. Line Charts: Function Costs by Network ---
-    fig, axes = plt.subplots(3, 2, figsize=(20, 24))
+    fig, axes = plt.subplots(3, 2, figsize=(20, 24), sharey=True, constrained_layout=True)
     fig.suptitle('Function Cost Comparison by Contract (Log Scale)', fontsize=20, fontweight='bold')
     axes = axes.flatten()
 
     for i, contract in enumerate(contracts):
         ax = axes[i]
-        contract_data = df[df['Contract'] == contract]
-        functions = contract_data['Function'].unique()
+        pivot = pivot_all.xs(contract)
 
         for network in networks:
-            network_data = contract_data[contract_data['Network'] == network].set_index('Function')
-            network_data = network_data.reindex(functions)
-            ax.plot(network_data.index, network_data['usd avg'], marker='o', linestyle='-', label=network)
+            ax.plot(pivot.index, pivot[network], marker='o', linestyle='-', label=network)
 
         ax.set_title(f'{contract}', fontsize=14, fontweight='bold')
         ax.set_yscale('log')
-        ax.set_ylabel('Average Cost (USD) - Log Scale', fontsize=12)
+        # The y axis is shared, so only the left column carries its label
+        if ax.get_subplotspec().is_first_col():
+            ax.set_ylabel('Average Cost (USD) - Log Scale', fontsize=12)
         ax.tick_params(axis='x', rotation=45, labelsize=10)
         ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-        ax.legend()
 
     for i in range(len(contracts), len(axes)):
         axes[i].set_visible(False)
 
-    plt.tight_layout(rect=[0, 0.03, 1, 0.96])
+    # Every panel plots the same networks, so one legend below the grid covers them all
+    fig.legend(*axes[0].get_legend_handles_labels(), loc='outside lower center', ncol=len(networks), fontsize=12)
+
     output_path = os.path.join(output_dir, "merged_contract_costs_line_chart.png")
     plt.savefig(output_path, dpi=300)
     print(f"\nSuccessfully generated and saved the line chart to: {output_path}")
 
     # --- 4. Std Dev Bar Charts: Function Cost Variability ---
-    fig2, axes2 = plt.subplots(2, 3, figsize=(22, 12))
+    fig2, axes2 = plt.subplots(2, 3, figsize=(22, 12), constrained_layout=True)
     fig2.suptitle('Function Cost Variability Across Networks (Standard Deviation)', fontsize=20, fontweight='bold')
     axes2 = axes2.flatten()
 
     for i, contract in enumerate(contracts):
         ax = axes2[i]
-        contract_data = df[df['Contract'] == contract]
-        pivot = contract_data.pivot_table(index='Function', columns='Network', values='usd avg')
-        variation = pivot.std(axis=1).sort_values(ascending=False)
+        variation = variation_all.xs(contract, level='Contract').sort_values(ascending=False)
 
         variation.plot(kind='bar', ax=ax, color='skyblue', edgecolor='black')
         ax.set_title(f'{contract}', fontsize=14, fontweight='bold')
@@ -75,7 +82,6 @@ def create_line_charts(filepath='contract.csv'):
     for i in range(len(contracts), len(axes2)):
         axes2[i].set_visible(False)
 
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
     bar_output_path = os.path.join(output_dir, "function_cost_variability_stddev_chart.png")
     plt.savefig(bar_output_path, dpi=300)
     print(f"Successfully generated and saved the std deviation chart to: {bar_output_path}")
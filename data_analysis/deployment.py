@@ -1,12 +1,31 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from table_cache import load_table
+
+
+def parse_usd(series):
+    """Removes the '$' prefix and thousands separators from a currency column and converts it to float."""
+    return series.str.lstrip('$').str.replace(',', '', regex=False).astype('float64')
+
+
+def clean_costs(df):
+    """Converts the '$'-prefixed cost column to float, before the table is cached."""
+    df['Est. Deployment Cost (USD)'] = parse_usd(df['Est. Deployment Cost (USD)'])
+    return df
+
+
+def format_costs(costs):
+    """Formats an array of USD costs as labels, with more decimals for smaller amounts."""
+    formats = np.select([costs < 0.001, costs < 1], ['${:.6f}', '${:.4f}'], default='${:.2f}')
+    return [fmt.format(cost) for fmt, cost in zip(formats, costs)]
+
 
 # --- Data Loading and Cleaning ---
-# Read the CSV file
+# Read the CSV file (cost column already converted to float, labels as categoricals)
 # Create a dummy CSV for demonstration if the file doesn't exist
 try:
-    df = pd.read_csv('deploymentgasestimation.csv')
+    df = load_table('deploymentgasestimation.csv', dtype={'Contract': 'category', 'Network': 'category'}, clean=clean_costs)
 except FileNotFoundError:
     print("deploymentgasestimation.csv not found. Creating a dummy dataframe for demonstration.")
     data = {
@@ -15,10 +34,11 @@ except FileNotFoundError:
         'Est. Deployment Cost (USD)': ['$55.20', '$0.08', '$0.95', '$120.50', '$0.15', '$1.50', '$150.75', '$0.20', '$2.10', '$80.00', '$0.12', '$1.20', '$95.30', '$0.14', '$1.35', '$250.00', '$0.30', '$3.00']
     }
     df = pd.DataFrame(data)
-
-
-# Clean the data: remove '$' and convert to float
-df['Est. Deployment Cost (USD)'] = df['Est. Deployment Cost (USD)'].replace({'\$': ''}, regex=True).astype(float)
+    # Clean the data: remove '$' and convert to float
+    df = clean_costs(df)
+    # Low-cardinality labels are stored as categoricals
+    for column in ('Contract', 'Network'):
+        df[column] = df[column].astype('category')
 
 # --- Ethereum Cost Analysis and Comparison Table ---
 
@@ -35,14 +55,14 @@ print(f"Average Estimated Cost for a contract on Ethereum: ${average_ethereum_co
 print("-" * 40)
 
 
-# Create a dictionary for easy lookup of Ethereum costs by contract
-ethereum_cost_map = ethereum_df.set_index('Contract')['Est. Deployment Cost (USD)'].to_dict()
-
-# Filter for other networks to compare against Ethereum
-comparison_df = df[df['Network'] != 'Ethereum'].copy()
+# Ethereum cost of each contract, renamed so it can be joined onto other networks
+ethereum_costs = ethereum_df[['Contract', 'Est. Deployment Cost (USD)']].rename(
+    columns={'Est. Deployment Cost (USD)': 'Ethereum Cost (USD)'}
+)
 
-# Add the corresponding Ethereum cost to each row for comparison
-comparison_df['Ethereum Cost (USD)'] = comparison_df['Contract'].map(ethereum_cost_map)
+# Filter for other networks to compare against Ethereum and add the
+# corresponding Ethereum cost to each row with a single hash join
+comparison_df = df[df['Network'] != 'Ethereum'].merge(ethereum_costs, on='Contract', how='left')
 
 # Calculate the discount vs Ethereum in USD and percentage
 comparison_df['Discount (USD)'] = comparison_df['Ethereum Cost (USD)'] - comparison_df['Est. Deployment Cost (USD)']
@@ -60,12 +80,13 @@ formatted_table = comparison_df[[
     'Discount (%)'
 ]].sort_values(by=['Contract', 'Est. Deployment Cost (USD)']).reset_index(drop=True)
 
-formatted_table['Est. Deployment Cost (USD)'] = formatted_table['Est. Deployment Cost (USD)'].apply(lambda x: f"${x:,.4f}")
-formatted_table['Ethereum Cost (USD)'] = formatted_table['Ethereum Cost (USD)'].apply(lambda x: f"${x:,.2f}")
-formatted_table['Discount (USD)'] = formatted_table['Discount (USD)'].apply(lambda x: f"${x:,.2f}")
-formatted_table['Discount (%)'] = formatted_table['Discount (%)'].apply(lambda x: f"{x:.2f}%")
-
-print(formatted_table.to_string())
+# Values are only formatted while rendering, without building string columns
+print(formatted_table.to_string(formatters={
+    'Est. Deployment Cost (USD)': '${:,.4f}'.format,
+    'Ethereum Cost (USD)': '${:,.2f}'.format,
+    'Discount (USD)': '${:,.2f}'.format,
+    'Discount (%)': '{:.2f}%'.format,
+}))
 print("\n" + "="*80 + "\n")
 
 
@@ -73,17 +94,23 @@ print("\n" + "="*80 + "\n")
 
 # Exclude Ethereum from the visualization part of the analysis
 df_filtered = df[df['Network'] != 'Ethereum'].copy()
+# Value labels shared by the bar and line charts, formatted once up front
+df_filtered['Cost Label'] = format_costs(df_filtered['Est. Deployment Cost (USD)'].to_numpy())
 
 # Get unique contracts and networks for plotting
 contracts = df_filtered['Contract'].unique()
 networks = df_filtered['Network'].unique()
 
+# Row positions of each contract, so the per-contract loops below slice
+# directly instead of rescanning the whole column every time
+contract_rows = df_filtered.groupby('Contract', sort=False, observed=True).indices
+
 # Set up color palette
 colors = plt.cm.Set3(np.linspace(0, 1, len(networks)))
 network_colors = dict(zip(networks, colors))
 
 # Create figure with 3x2 subplots for bar charts
-fig1, axes1 = plt.subplots(3, 2, figsize=(15, 12))
+fig1, axes1 = plt.subplots(3, 2, figsize=(15, 12), constrained_layout=True)
 fig1.suptitle('Deployment Cost by Contract (Log Scale)', fontsize=16, fontweight='bold')
 
 
@@ -93,7 +120,7 @@ axes1_flat = axes1.flatten()
 # Create bar charts for each contract
 for i, contract in enumerate(contracts):
     ax = axes1_flat[i]
-    contract_data = df_filtered[df_filtered['Contract'] == contract]
+    contract_data = df_filtered.take(contract_rows[contract])
     
     # Sort by deployment cost for better visualization
     contract_data = contract_data.sort_values('Est. Deployment Cost (USD)')
@@ -109,10 +136,10 @@ for i, contract in enumerate(contracts):
     ax.set_xticklabels(contract_data['Network'], rotation=45, ha='right', fontsize=9)
     
     # Add value labels on bars
-    for j, (bar, cost) in enumerate(zip(bars, contract_data['Est. Deployment Cost (USD)'])):
+    for bar, label in zip(bars, contract_data['Cost Label']):
         height = bar.get_height()
         ax.text(bar.get_x() + bar.get_width()/2., height * 1.1,  # Adjust position for log scale
-                f'${cost:.6f}' if cost < 0.001 else (f'${cost:.4f}' if cost < 1 else f'${cost:.2f}'),
+                label,
                 ha='center', va='bottom', fontsize=8, rotation=90)
     
     ax.grid(True, alpha=0.3, which='both')  # Show both major and minor grid lines
@@ -121,12 +148,11 @@ for i, contract in enumerate(contracts):
 for i in range(len(contracts), len(axes1_flat)):
     axes1_flat[i].set_visible(False)
 
-plt.tight_layout(rect=[0, 0, 1, 0.96])
 plt.savefig('deployment_costs_bar_charts.png', dpi=300, bbox_inches='tight')
 plt.show()
 
 # Create figure with 3x2 subplots for line charts
-fig2, axes2 = plt.subplots(3, 2, figsize=(15, 12))
+fig2, axes2 = plt.subplots(3, 2, figsize=(15, 12), sharey=True, constrained_layout=True)
 fig2.suptitle('Deployment Cost Ranking by Contract (Log Scale)', fontsize=16, fontweight='bold')
 
 
@@ -136,30 +162,31 @@ axes2_flat = axes2.flatten()
 # Create line charts for each contract
 for i, contract in enumerate(contracts):
     ax = axes2_flat[i]
-    contract_data = df_filtered[df_filtered['Contract'] == contract]
+    contract_data = df_filtered.take(contract_rows[contract])
     
     # Sort by deployment cost for better visualization
     contract_data = contract_data.sort_values('Est. Deployment Cost (USD)')
+    costs = contract_data['Est. Deployment Cost (USD)'].to_numpy()
+    positions = np.arange(len(costs))
     
-    ax.plot(range(len(contract_data)), 
-            contract_data['Est. Deployment Cost (USD)'],
+    ax.plot(positions, costs,
             marker='o', linewidth=2, markersize=8, color='steelblue', zorder=4)
     
-    # Color each point based on network
-    for j, (idx, row) in enumerate(contract_data.iterrows()):
-        ax.scatter(j, row['Est. Deployment Cost (USD)'], 
-                   color=network_colors.get(row['Network'], '#808080'), s=100, zorder=5)
+    # Color each point based on network (one scatter call for all points)
+    ax.scatter(positions, costs,
+               color=[network_colors.get(net, '#808080') for net in contract_data['Network']], s=100, zorder=5)
     
     ax.set_title(f'{contract}', fontweight='bold', fontsize=12)
-    ax.set_ylabel('Deployment Cost (USD) - Log Scale', fontsize=10)
+    # The y axis is shared, so only the left column carries its label
+    if ax.get_subplotspec().is_first_col():
+        ax.set_ylabel('Deployment Cost (USD) - Log Scale', fontsize=10)
     ax.set_yscale('log')  # Use logarithmic scale
     ax.set_xticks(range(len(contract_data)))
     ax.set_xticklabels(contract_data['Network'], rotation=45, ha='right', fontsize=9)
     
     # Add value labels on points
-    for j, (idx, row) in enumerate(contract_data.iterrows()):
-        cost = row['Est. Deployment Cost (USD)']
-        ax.annotate(f'${cost:.6f}' if cost < 0.001 else (f'${cost:.4f}' if cost < 1 else f'${cost:.2f}'),
+    for j, cost, label in zip(positions, costs, contract_data['Cost Label']):
+        ax.annotate(label,
                       (j, cost), textcoords="offset points", 
                       xytext=(0,15), ha='center', fontsize=8)  # Increased offset for log scale
     
@@ -169,7 +196,6 @@ for i, contract in enumerate(contracts):
 for i in range(len(contracts), len(axes2_flat)):
     axes2_flat[i].set_visible(False)
 
-plt.tight_layout(rect=[0, 0, 1, 0.96])
 plt.savefig('deployment_costs_line_charts.png', dpi=300, bbox_inches='tight')
 plt.show()
 
@@ -177,10 +203,10 @@ plt.show()
 plt.figure(figsize=(16, 10))
 
 # Calculate average deployment cost per network across all contracts
-network_avg_costs = df_filtered.groupby('Network')['Est. Deployment Cost (USD)'].mean().sort_values()
+network_avg_costs = df_filtered.groupby('Network', observed=True)['Est. Deployment Cost (USD)'].mean().sort_values()
 
 # Create a comprehensive comparison
-fig3, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8))
+fig3, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8), constrained_layout=True)
 fig3.suptitle('Overall Deployment Cost Analysis (Non-Ethereum Networks)', fontsize=16, fontweight='bold')
 
 
@@ -205,24 +231,22 @@ ax1.grid(True, alpha=0.3)
 contract_data_for_plot = []
 contract_labels = []
 for contract in contracts:
-    contract_costs = df_filtered[df_filtered['Contract'] == contract]['Est. Deployment Cost (USD)'].values
+    contract_costs = df_filtered.take(contract_rows[contract])['Est. Deployment Cost (USD)'].values
     contract_data_for_plot.append(contract_costs)
     contract_labels.append(contract)
 
-bp = ax2.boxplot(contract_data_for_plot, labels=contract_labels, patch_artist=True)
+bp = ax2.boxplot(contract_data_for_plot, labels=contract_labels, patch_artist=True, boxprops={'alpha': 0.7})
 ax2.set_title('Deployment Cost Distribution by Contract Type\n(Across All Networks)', fontweight='bold', fontsize=14)
 ax2.set_ylabel('Deployment Cost (USD)', fontsize=12)
 ax2.set_xticklabels(contract_labels, rotation=45, ha='right', fontsize=11)
 
-# Color the boxplots
+# Color the boxplots (transparency is already set through boxprops)
 colors_box = plt.cm.Set2(np.linspace(0, 1, len(contracts)))
 for patch, color in zip(bp['boxes'], colors_box):
     patch.set_facecolor(color)
-    patch.set_alpha(0.7)
 
 ax2.grid(True, alpha=0.3)
 
-plt.tight_layout(rect=[0, 0, 1, 0.95])
 plt.savefig('deployment_costs_summary.png', dpi=300, bbox_inches='tight')
 plt.show()
 
@@ -246,25 +270,25 @@ eth_row = pd.DataFrame({
 # Combine and sort by average cost
 final_summary_df = pd.concat([summary_df, eth_row]).sort_values('Avg. Cost (USD)')
 
-# Format for printing
-final_summary_df_formatted = final_summary_df.copy()
-final_summary_df_formatted.index.name = "Network"
-final_summary_df_formatted['Avg. Cost (USD)'] = final_summary_df_formatted['Avg. Cost (USD)'].apply(lambda x: f"${x:,.6f}")
-final_summary_df_formatted['Cost Difference (USD)'] = final_summary_df_formatted['Cost Difference (USD)'].apply(lambda x: f"${x:,.6f}")
-final_summary_df_formatted['Discount (%)'] = final_summary_df_formatted['Discount (%)'].apply(lambda x: f"{x:.2f}%")
+# Format for printing (values are only formatted while rendering)
+final_summary_df.index.name = "Network"
 
 print("\n--- Average Deployment Cost by Network (Compared to Ethereum) ---")
-print(final_summary_df_formatted.to_string())
+print(final_summary_df.to_string(formatters={
+    'Avg. Cost (USD)': '${:,.6f}'.format,
+    'Cost Difference (USD)': '${:,.6f}'.format,
+    'Discount (%)': '{:.2f}%'.format,
+}))
 
 # Keep the other summary sections, clarifying they are for non-ETH networks
 print("\nCheapest deployment options by contract (Non-Ethereum):")
 for contract in contracts:
-    contract_data = df_filtered[df_filtered['Contract'] == contract]
+    contract_data = df_filtered.take(contract_rows[contract])
     cheapest = contract_data.loc[contract_data['Est. Deployment Cost (USD)'].idxmin()]
     print(f"{contract:15}: {cheapest['Network']} (${cheapest['Est. Deployment Cost (USD)']:.6f})")
 
 print("\nMost expensive deployment options by contract (Non-Ethereum):")
 for contract in contracts:
-    contract_data = df_filtered[df_filtered['Contract'] == contract]
+    contract_data = df_filtered.take(contract_rows[contract])
     most_expensive = contract_data.loc[contract_data['Est. Deployment Cost (USD)'].idxmax()]
     print(f"{contract:15}: {most_expensive['Network']} (${most_expensive['Est. Deployment Cost (USD)']:.2f})")
@@ -0,0 +1,88 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import json
+import os
+
+# Bump this whenever the parsing or a clean callback changes, so cached copies
+# written by the old code are rebuilt
+CACHE_VERSION = 1
+CACHE_KEY = b'table_cache_key'
+
+def cache_key(csv_path, dtype=None):
+    """
+    Builds the key stored with a cached table: the CSV's size and modification
+    time, the dtype mapping and CACHE_VERSION.
+    """
+    stat = os.stat(csv_path)
+    key = {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'dtype': {column: str(kind) for column, kind in (dtype or {}).items()},
+    }
+    return json.dumps(key, sort_keys=True).encode()
+
+def read_cache(parquet_path, key):
+    """Returns the cached table if it exists, is readable and matches key, otherwise None."""
+    try:
+        if (pq.read_schema(parquet_path).metadata or {}).get(CACHE_KEY) != key:
+            return None
+        return pd.read_parquet(parquet_path)
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+def write_cache(df, parquet_path, key):
+    """
+    Writes the table to a temporary file and moves it into place, so an
+    interrupted run never leaves a partial cache. Failures are ignored, as the
+    CSV is simply parsed again next time.
+    """
+    tmp_path = parquet_path + '.tmp'
+    try:
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata({**table.schema.metadata, CACHE_KEY: key})
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, parquet_path)
+    except (OSError, ValueError, pa.ArrowException):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_table(csv_path, dtype=None, clean=None):
+    """
+    Loads a CSV file, caching a parsed Parquet copy alongside it.
+
+    The first run parses the CSV with Arrow's multi-threaded reader and writes
+    '<csv_path>.parquet'. Later runs read the Parquet copy instead, as long as
+    the key stored in its metadata (see cache_key) still matches. A missing,
+    stale or unreadable copy falls back to parsing the CSV.
+
+    Args:
+        csv_path (str): The path to the CSV file.
+        dtype (dict): Known column types, so the reader skips type inference.
+            Columns declared 'category' are cached as categoricals too.
+        clean (callable): Optional function applied to the parsed DataFrame
+            before it is cached, so its work is not repeated on later runs.
+            Bump CACHE_VERSION when it changes.
+    """
+    parquet_path = csv_path + '.parquet'
+    key = cache_key(csv_path, dtype)
+    df = read_cache(parquet_path, key)
+    if df is not None:
+        return df
+
+    df = pd.read_csv(csv_path, engine='pyarrow', dtype_backend='pyarrow', dtype=dtype)
+    if clean is not None:
+        df = clean(df)
+    write_cache(df, parquet_path, key)
+    return df
+
+
+def mean_pivot(df):
+    """
+    Averages 'usd avg' per Contract/Function/Network and pivots the networks into
+    columns, keeping contracts and functions in the order they first appear.
+    """
+    means = df.groupby(['Contract', 'Function', 'Network'], sort=False, observed=True)['usd avg'].mean()
+    # unstack() sorts the rows; restore the order in which functions first appear
+    return means.unstack('Network').reindex(means.index.droplevel('Network').unique())
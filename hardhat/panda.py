@@ -1,37 +1,75 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+
+# Labels are read straight into categoricals (and cached that way). 'USD Avg'
+# is read as text because the reporter writes placeholders such as '-' there
+COLUMN_TYPES = {'Contract': 'category', 'Network': 'category', 'Method': 'category', 'USD Avg': 'string'}
+
+def load_table(csv_path):
+    """
+    Loads a CSV file, caching a parsed Parquet copy alongside it.
+
+    Malformed lines and rows without a USD cost are dropped before caching.
+    The Parquet copy is reused on later runs as long as it is newer than the CSV;
+    delete it after changing the cleanup below. An unreadable copy falls back
+    to parsing the CSV.
+    """
+    parquet_path = csv_path + '.parquet'
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except (OSError, ValueError):
+            pass
+
+    df = pd.read_csv(csv_path, engine='pyarrow', dtype_backend='pyarrow', on_bad_lines='skip', dtype=COLUMN_TYPES)
+    # Coerce the costs to numbers, turning placeholders and blanks into NaN, then
+    # drop those rows, as the cost is essential for the plots
+    df['USD Avg'] = pd.to_numeric(df['USD Avg'], errors='coerce').astype('float64')
+    df = df[df['USD Avg'].notna()]
+    # Write to a temporary file first so an interrupted run never leaves a partial cache
+    try:
+        df.to_parquet(parquet_path + '.tmp', compression='zstd')
+        os.replace(parquet_path + '.tmp', parquet_path)
+    except (OSError, ValueError):
+        pass
+    return df
 
 def generate_cost_visualizations():
     # --- 1. Load and Prepare Data ---
     try:
-        # Load the dataset, skipping any malformed lines
-        df = pd.read_csv('output.csv', on_bad_lines='skip')
+        # Load the dataset, skipping any malformed lines and rows without a USD cost
+        df = load_table('output.csv')
         print("CSV file loaded successfully.")
     except FileNotFoundError:
         print("Error: output.csv not found. Please ensure the file is in the correct directory.")
         return
 
-    # Convert 'USD Avg' to a numeric type, coercing errors to NaN
-    df['USD Avg'] = pd.to_numeric(df['USD Avg'], errors='coerce')
-    # Drop rows where USD cost is not available, as it's essential for the plots
-    df.dropna(subset=['USD Avg'], inplace=True)
-
     # Set a professional and clean plot style
     sns.set_style("whitegrid")
     plt.rcParams['figure.figsize'] = (16, 10)
     plt.rcParams['font.size'] = 12
+    # DataFrame.plot creates its own figures, so enable constrained layout globally
+    plt.rcParams['figure.constrained_layout.use'] = True
 
     # --- 2. Chart 1: Total Execution Cost per Function (Stacked Bar) ---
 
-    # Filter out 'deployment' costs to focus on recurring execution costs
-    execution_df = df[df['Method'] != 'deployment'].copy()
-
-    # Group by function (Method) and Network, then sum the USD costs
-    total_cost_by_function = execution_df.groupby(['Method', 'Network'])['USD Avg'].sum().reset_index()
-
-    # Pivot the data to prepare for stacking: Methods as columns, Networks as index
-    pivot_execution = total_cost_by_function.pivot(index='Method', columns='Network', values='USD Avg').fillna(0)
+    # Sum the USD costs once per function (Method), contract and network; both
+    # charts below are sliced from this single grouping. dropna=False keeps rows
+    # with a blank Contract, which still count towards the execution totals
+    total_costs = df.groupby(['Method', 'Contract', 'Network'], observed=True, dropna=False)['USD Avg'].sum()
+
+    # Filter out 'deployment' costs to focus on recurring execution costs, then
+    # total each function across contracts: Methods as index, Networks as columns.
+    # drop raises KeyError for a missing label, so only drop when deployments exist
+    has_deployment = 'deployment' in total_costs.index.get_level_values('Method')
+    execution_costs = total_costs.drop('deployment', level='Method') if has_deployment else total_costs
+    pivot_execution = (
+        execution_costs
+        .groupby(level=['Method', 'Network'], observed=True).sum()
+        .unstack('Network').fillna(0)
+    )
 
     # Plotting the stacked bar chart
     ax1 = pivot_execution.plot(kind='bar', stacked=True, colormap='viridis', width=0.8)
@@ -48,7 +86,6 @@ def generate_cost_visualizations():
     ax1.get_yaxis().set_major_formatter(plt.FuncFormatter(lambda x, loc: "${:,.4f}".format(x)))
 
 
-    plt.tight_layout()
     plt.savefig('total_execution_cost_by_function.png')
     plt.close()
     print("Chart 'total_execution_cost_by_function.png' saved successfully.")
@@ -56,11 +93,12 @@ def generate_cost_visualizations():
 
     # --- 3. Chart 2: Deployment Cost per Contract (Stacked Bar) ---
 
-    # Filter the DataFrame to only include 'deployment' methods
-    deployment_df = df[df['Method'] == 'deployment'].copy()
+    if not has_deployment:
+        print("No deployment rows found; skipping 'deployment_cost_by_contract.png'.")
+        return
 
-    # Pivot the data: Contracts as index, Networks as columns, USD Avg as values
-    pivot_deployment = deployment_df.pivot(index='Contract', columns='Network', values='USD Avg').fillna(0)
+    # Only the 'deployment' rows: Contracts as index, Networks as columns, USD Avg as values
+    pivot_deployment = total_costs.xs('deployment', level='Method').unstack('Network').fillna(0)
 
     # Plotting the stacked bar chart
     ax2 = pivot_deployment.plot(kind='bar', stacked=True, colormap='plasma', width=0.8)
@@ -76,7 +114,6 @@ def generate_cost_visualizations():
     ax2.get_yaxis().set_major_formatter(plt.FuncFormatter(lambda x, loc: "${:,.2f}".format(x)))
 
 
-    plt.tight_layout()
     plt.savefig('deployment_cost_by_contract.png')
     plt.close()
     print("Chart 'deployment_cost_by_contract.png' saved successfully.")